@@ -1,15 +1,23 @@
 import os
+import sys
+import copy
+import atexit
 import time
+import threading
 import random
 import re
 import requests
+import numpy as np
 from flask import Flask, request, abort
 from openai import OpenAI
 
 import json
+import sqlite3
 import gspread
 from google.oauth2.service_account import Credentials
 from typing import Optional
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
 
 app = Flask(__name__)
 
@@ -22,20 +30,32 @@ OPENAI_API_KEY = os.environ["OPENAI_API_KEY"]
 ADMIN_CHAT_ID = int(os.environ.get("ADMIN_CHAT_ID", "0"))  # optional
 CRON_SECRET = os.environ.get("CRON_SECRET", "")           # optional (recommended)
 
-BASE_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+# one pooled HTTP session for every bot token
+http = requests.Session()
+http.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
 FANVUE_LINK = "https://www.fanvue.com/avelynnoira/fv-7"
 
 MODEL = "gpt-4.1-mini"
 MAX_OUTPUT_TOKENS = 190
 
+# Model routing (per message class)
+MODEL_FAST = os.environ.get("MODEL_FAST", "gpt-4.1-nano")
+MODEL_HOT = os.environ.get("MODEL_HOT", MODEL)
+MAX_OUTPUT_TOKENS_FAST = int(os.environ.get("MAX_OUTPUT_TOKENS_FAST", "80"))
+MAX_OUTPUT_TOKENS_HOT = int(os.environ.get("MAX_OUTPUT_TOKENS_HOT", str(MAX_OUTPUT_TOKENS)))
+
 # Anti-dup + anti-spam
 PROCESSED_TTL_SECONDS = 60 * 10
 MAX_MSGS_PER_MINUTE = 7
 
 # Admin alerts + re-engage
 ALERT_COOLDOWN_MINUTES = 25
+ALERT_DIGEST_SECONDS = int(os.environ.get("ALERT_DIGEST_SECONDS", "300"))   # 0 = send every alert immediately
+ALERT_DIGEST_TOP = int(os.environ.get("ALERT_DIGEST_TOP", "5"))
+ALERT_URGENT_HESITATION = int(os.environ.get("ALERT_URGENT_HESITATION", "6"))
 REENGAGE_COOLDOWN_HOURS = 24
 
 # Follow-ups (requires /cron pinging)
@@ -50,6 +70,26 @@ HISTORY_TURNS = 14
 # Human timing
 MAX_DELAY_SECONDS = 22.0
 
+# Inbound queue (webhook acks fast, workers process)
+# Simulated time (see VirtualClock); forces inline processing so sleeps don't pile up across workers
+SIMULATED_CLOCK = os.environ.get("SIMULATED_CLOCK", "0") == "1"
+ASYNC_WEBHOOK = os.environ.get("ASYNC_WEBHOOK", "1") == "1" and not SIMULATED_CLOCK
+INBOX_DB_PATH = os.environ.get("INBOX_DB_PATH", "inbox.sqlite3")
+INBOX_WORKERS = int(os.environ.get("INBOX_WORKERS", "8"))
+INBOX_LEASE_SECONDS = 120   # must exceed the longest single update (MAX_DELAY_SECONDS + GPT)
+INBOX_MAX_ATTEMPTS = 3
+
+# User state: bounded hot set in memory, idle users on disk
+USER_STORE_PATH = os.environ.get("USER_STORE_PATH", "users.sqlite3")
+HOT_USERS_MAX = int(os.environ.get("HOT_USERS_MAX", "5000"))
+HOT_IDLE_HOURS = float(os.environ.get("HOT_IDLE_HOURS", "6"))
+
+# Diagnostics
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", "3.0"))
+SLOW_LOG_SIZE = int(os.environ.get("SLOW_LOG_SIZE", "50"))
+PROFILE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_SECONDS", "0.005"))
+PROFILE_MAX_SECONDS = 120
+
 # ============================================================
 # 0.1) BIO (used only when relevant)
 # ============================================================
@@ -95,6 +135,46 @@ def founders_bonus_line() -> str:
         return ""
     return "Also, the first 50 get an exclusive bonus drop at signup that nobody else will get later."
 
+# ============================================================
+# 0.25) TENANTS (several bots / personas in one process)
+# TENANTS_JSON = {"<id>": {"telegram_token", "fanvue_link", "persona",
+#                          "persona_short", "bio", "admin_chat_id", "onboarding"}}
+# The env-configured bot above is always the "default" tenant on /webhook.
+# ============================================================
+DEFAULT_TENANT = "default"
+TENANTS_JSON = os.environ.get("TENANTS_JSON", "")
+
+def tenant_config(tid: str, cfg: dict) -> dict:
+    if not re.fullmatch(r"[a-z0-9_]{1,32}", tid):
+        raise ValueError(f"invalid tenant id: {tid!r}")
+    persona = cfg.get("persona", "Avelyn Noira")
+    return {
+        "id": tid,
+        "base_url": f"https://api.telegram.org/bot{cfg['telegram_token']}",
+        "fanvue_link": cfg["fanvue_link"],
+        "persona": persona,
+        "persona_short": cfg.get("persona_short", persona.split()[0]),
+        "bio": cfg.get("bio", ""),
+        "admin_chat_id": int(cfg.get("admin_chat_id", 0) or 0),
+        "onboarding": cfg.get("onboarding", ""),
+    }
+
+TENANT_CONFIGS = {
+    DEFAULT_TENANT: tenant_config(DEFAULT_TENANT, {
+        "telegram_token": TELEGRAM_TOKEN,
+        "fanvue_link": FANVUE_LINK,
+        "persona": "Avelyn Noira",
+        "bio": AVELYN_BIO,
+        "admin_chat_id": ADMIN_CHAT_ID,
+        "onboarding": (
+            "Hey 🙂 I’m Avelyn’s assistant. I help manage her DMs so she can stay focused on training and padel.\n"
+            "What are you looking for today, private content, customs, or a real chat with her?"
+        ),
+    }),
+}
+for _tid, _cfg in (json.loads(TENANTS_JSON) if TENANTS_JSON else {}).items():
+    TENANT_CONFIGS[_tid] = tenant_config(_tid, _cfg)
+
 # ============================================================
 # 0.3) GOOGLE SHEETS DASHBOARD (optional)
 # ============================================================
@@ -102,7 +182,31 @@ SHEET_LOGGING_ENABLED = os.environ.get("SHEET_LOGGING_ENABLED", "1") == "1"
 GOOGLE_SERVICE_ACCOUNT_JSON = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON", "")
 GOOGLE_SHEET_ID = os.environ.get("GOOGLE_SHEET_ID", "")
 
+# "append" = one row per event (sheet1), "status" = one upserted row per uid
+SHEET_MODE = os.environ.get("SHEET_MODE", "append")
+SHEET_STATUS_TAB = os.environ.get("SHEET_STATUS_TAB", "status")
+SHEET_INDEX_PATH = os.environ.get("SHEET_INDEX_PATH", "sheet_index.json")
+SHEET_FLUSH_SECONDS = float(os.environ.get("SHEET_FLUSH_SECONDS", "30"))
+
+STATUS_HEADER = [
+    "uid",
+    "name",
+    "status",
+    "intent",
+    "phase",
+    "link_stage",
+    "hesitation_score",
+    "messages",
+    "followups_today",
+    "last_seen_utc",
+    "last_event",
+    "last_event_utc",
+    "text_preview",
+    "tenant",
+]
+
 sheet = None
+status_ws = None
 if SHEET_LOGGING_ENABLED and GOOGLE_SERVICE_ACCOUNT_JSON and GOOGLE_SHEET_ID:
     try:
         creds_dict = json.loads(GOOGLE_SERVICE_ACCOUNT_JSON)
@@ -134,26 +238,430 @@ if SHEET_LOGGING_ENABLED and GOOGLE_SERVICE_ACCOUNT_JSON and GOOGLE_SHEET_ID:
                 "last_seen_utc",
                 "text_preview",
                 "status",
+                "tenant",
             ], value_input_option="USER_ENTERED")
+
+        if SHEET_MODE == "status":
+            book = sheet.spreadsheet
+            try:
+                status_ws = book.worksheet(SHEET_STATUS_TAB)
+            except gspread.WorksheetNotFound:
+                status_ws = book.add_worksheet(SHEET_STATUS_TAB, rows=1000, cols=len(STATUS_HEADER))
+            if status_ws.row_values(1) == []:
+                status_ws.update(range_name="A1", values=[STATUS_HEADER], value_input_option="USER_ENTERED")
         print("✅ Google Sheet connected")
     except Exception as e:
         sheet = None
+        status_ws = None
         print("❌ Google Sheet connect failed:", e)
 
 # ============================================================
-# 1) IN-MEMORY STATE (Render restart resets)
+# 0.9) CLOCK (real by default, virtual for simulation)
 # ============================================================
-memory = {}      # uid -> user_state dict
+class Clock:
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+class VirtualClock(Clock):
+    """
+    Simulated time: sleep() just advances the clock, so a driver can replay
+    a day of traffic and /cron ticks in seconds (see sim_followups.py).
+    There is one timeline, so updates must be handled inline (SIMULATED_CLOCK=1
+    turns ASYNC_WEBHOOK off); concurrent sleepers would each push it forward.
+    """
+    def __init__(self, start: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._now = float(start if start is not None else time.time())
+
+    def now(self) -> float:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        with self._lock:
+            self._now += max(0.0, float(seconds))
+
+clock = VirtualClock() if SIMULATED_CLOCK else Clock()
+
+def set_clock(c: Clock):
+    """
+    Swap the clock at runtime. A VirtualClock should only be used with ASYNC_WEBHOOK off.
+    """
+    global clock
+    clock = c
+
+# ============================================================
+# 1) USER STATE (hot LRU in memory, idle users spilled to disk)
+# ============================================================
+def next_due_ts(u: dict) -> float:
+    """
+    Earliest time /cron could act on a user (follow-up or re-engage).
+    Errs early: cron re-checks eligibility after promoting the user.
+    Users in takeover are never due; they get a new due time when spilled again.
+    """
+    if u.get("takeover"):
+        return float("inf")
+    due = max(u.get("last_seen_ts", 0.0), u.get("last_reengage_ts", 0.0)) + REENGAGE_COOLDOWN_HOURS * 3600
+    last_bot = u.get("last_bot_ts", 0.0)
+    if (
+        u.get("link_stage", 0) != 2
+        and last_bot > 0.0
+        and u.get("last_seen_ts", 0.0) <= last_bot
+    ):
+        count = u.get("followups_sent_today", 0)
+        if count >= FOLLOWUP_MAX_PER_DAY:
+            # counter resets at the next UTC day
+            due = min(due, (int(clock.now() // 86400) + 1) * 86400)
+        else:
+            minutes = [FOLLOWUP_1_MINUTES, FOLLOWUP_2_MINUTES, FOLLOWUP_3_MINUTES][min(count, 2)]
+            due = min(due, last_bot + minutes * 60)
+    return due
+
+class UserStore:
+    """
+    uid -> user_state. The most recently used users live in a bounded LRU,
+    the rest are spilled as JSON to SQLite and promoted back on access.
+    Every user keeps a row; hot ones are flagged hot=1 (skipped by the due scan)
+    and their row is refreshed by checkpoint() and on spill, so a kill loses at
+    most the changes since the last checkpoint.
+    """
+    def __init__(self, path: str, max_hot: int, table: str = "users"):
+        self.table = table
+        self.max_hot = max(1, max_hot)
+        self.hot = OrderedDict()
+        self.pinned = {}   # uid -> number of holders
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                uid INTEGER PRIMARY KEY,
+                state TEXT NOT NULL,
+                due_ts REAL NOT NULL,
+                hot INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cols = [r[1] for r in self.db.execute(f"PRAGMA table_info({self.table})").fetchall()]
+        if "hot" not in cols:
+            self.db.execute(f"ALTER TABLE {self.table} ADD COLUMN hot INTEGER NOT NULL DEFAULT 0")
+        # nothing is in memory yet after a restart
+        self.db.execute(f"UPDATE {self.table} SET hot = 0 WHERE hot = 1")
+        self.db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_due ON {self.table} (hot, due_ts)")
+
+    def _write(self, uid: int, u: dict, hot: bool):
+        self.db.execute(
+            f"INSERT OR REPLACE INTO {self.table} (uid, state, due_ts, hot) VALUES (?, ?, ?, ?)",
+            (uid, json.dumps(u), next_due_ts(u), int(hot)),
+        )
+
+    def _spill(self, uid: int, u: dict):
+        self._write(uid, u, hot=False)
+
+    def _promote(self, uid: int) -> Optional[dict]:
+        row = self.db.execute(f"SELECT state FROM {self.table} WHERE uid = ?", (uid,)).fetchone()
+        if row is None:
+            return None
+        # the row stays as the on-disk copy until the next checkpoint / spill
+        self.db.execute(f"UPDATE {self.table} SET hot = 1 WHERE uid = ?", (uid,))
+        u = json.loads(row[0])
+        self._put(uid, u)
+        return u
+
+    def _put(self, uid: int, u: dict):
+        self.hot[uid] = u
+        self.hot.move_to_end(uid)
+        excess = len(self.hot) - self.max_hot
+        if excess <= 0:
+            return
+        # pinned users stay hot even if that means running over max_hot for a while
+        victims = []
+        for old_uid in self.hot:
+            if old_uid not in self.pinned:
+                victims.append(old_uid)
+                if len(victims) >= excess:
+                    break
+        for old_uid in victims:
+            self._spill(old_uid, self.hot.pop(old_uid))
+
+    @contextmanager
+    def holding(self, uid):
+        """
+        Pins uid while a caller holds (and mutates) its state dict, so it can't be
+        spilled underneath it and have the changes lost.
+        """
+        with self.lock:
+            self.pinned[uid] = self.pinned.get(uid, 0) + 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                n = self.pinned.pop(uid, 1) - 1
+                if n > 0:
+                    self.pinned[uid] = n
+
+    def get(self, uid: int, default=None):
+        with self.lock:
+            u = self.hot.get(uid)
+            if u is not None:
+                self.hot.move_to_end(uid)
+                return u
+            u = self._promote(uid)
+            return u if u is not None else default
+
+    def __contains__(self, uid) -> bool:
+        return self.get(uid) is not None
+
+    def __getitem__(self, uid: int) -> dict:
+        u = self.get(uid)
+        if u is None:
+            raise KeyError(uid)
+        return u
+
+    def __setitem__(self, uid: int, u: dict):
+        with self.lock:
+            self._write(uid, u, hot=True)
+            self._put(uid, u)
+
+    def pop(self, uid: int, default=None):
+        with self.lock:
+            u = self.hot.pop(uid, None)
+            if u is None:
+                row = self.db.execute(f"SELECT state FROM {self.table} WHERE uid = ?", (uid,)).fetchone()
+                u = json.loads(row[0]) if row else None
+            self.db.execute(f"DELETE FROM {self.table} WHERE uid = ?", (uid,))
+            return u if u is not None else default
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def cold_count(self) -> int:
+        with self.lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM {self.table} WHERE hot = 0").fetchone()[0]
+
+    def due_items(self, now: float, limit: int = 200):
+        """
+        Yields hot users, then cold users whose follow-up/re-engage time has passed.
+        Each user is pinned, then looked up again, so the caller always gets the
+        stored dict even if it was evicted while waiting its turn.
+        """
+        with self.lock:
+            uids = list(self.hot)
+            uids += [uid for (uid,) in self.db.execute(
+                f"SELECT uid FROM {self.table} WHERE hot = 0 AND due_ts <= ? ORDER BY due_ts LIMIT ?",
+                (now, limit),
+            ).fetchall()]
+        for uid in uids:
+            with self.holding(uid):
+                with self.lock:
+                    u = self.hot.get(uid)
+                    if u is None:
+                        u = self._promote(uid)
+                if u is not None:
+                    yield uid, u
+
+    def spill_idle(self, idle_seconds: float, now: float) -> int:
+        with self.lock:
+            idle = [
+                uid for uid, u in self.hot.items()
+                if uid not in self.pinned and now - u.get("last_seen_ts", now) >= idle_seconds
+            ]
+            for uid in idle:
+                self._spill(uid, self.hot.pop(uid))
+            return len(idle)
+
+    def checkpoint(self) -> int:
+        """
+        Refresh the on-disk copy of hot users. Pinned ones are being mutated
+        right now and are picked up by the next checkpoint.
+        """
+        with self.lock:
+            n = 0
+            for uid, u in self.hot.items():
+                if uid not in self.pinned:
+                    self._write(uid, u, hot=True)
+                    n += 1
+            return n
+
+    def spill_all(self):
+        with self.lock:
+            for uid, u in list(self.hot.items()):
+                self._spill(uid, u)
+            self.hot.clear()
+
+# tenant id -> config + its own user state namespace ("memory": uid -> user_state dict)
+tenants = {}
+for _tid, _cfg in TENANT_CONFIGS.items():
+    tenants[_tid] = dict(_cfg, memory=UserStore(
+        USER_STORE_PATH, HOT_USERS_MAX, "users" if _tid == DEFAULT_TENANT else f"users_{_tid}"
+    ))
+    atexit.register(tenants[_tid]["memory"].spill_all)
+
+_tenant_ctx = threading.local()
+
+def tenant() -> dict:
+    """
+    Tenant of the update / cron pass being handled on this thread.
+    """
+    return getattr(_tenant_ctx, "t", None) or tenants[DEFAULT_TENANT]
+
+@contextmanager
+def using_tenant(t: dict):
+    prev = getattr(_tenant_ctx, "t", None)
+    _tenant_ctx.t = t
+    try:
+        yield t
+    finally:
+        _tenant_ctx.t = prev
+
 processed = {}   # dedup_key -> ts
+_processed_lock = threading.Lock()   # shared by the inbox workers
 
 AB_VARIANTS = ["A", "B"]
 
+# ============================================================
+# 1.5) DIAGNOSTICS: STAGE TIMINGS + SLOW LOG + SAMPLING PROFILER
+# Uses wall time on purpose (not the injectable clock).
+# ============================================================
+_req_timing = threading.local()
+slow_requests = deque(maxlen=SLOW_LOG_SIZE)
+
+@contextmanager
+def timed(stage: str):
+    """
+    Exclusive per-stage timing for the current request: while a nested stage runs,
+    its parent is paused, so stages add up to the measured total.
+    """
+    stack = getattr(_req_timing, "stack", None)
+    if stack is None:
+        yield
+        return
+    now = time.perf_counter()
+    if stack:
+        parent = stack[-1]
+        _req_timing.stages[parent[0]] = _req_timing.stages.get(parent[0], 0.0) + (now - parent[1])
+    stack.append([stage, now])
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        name, started = stack.pop()
+        _req_timing.stages[name] = _req_timing.stages.get(name, 0.0) + (end - started)
+        if stack:
+            stack[-1][1] = end
+
+def begin_timing():
+    _req_timing.started = time.perf_counter()
+    _req_timing.stages = {}
+    # time not claimed by a named stage is attributed to "app"
+    _req_timing.stack = [["app", _req_timing.started]]
+
+def end_timing(label: str):
+    started = getattr(_req_timing, "started", None)
+    if started is None:
+        return
+    end = time.perf_counter()
+    total = end - started
+    stages = _req_timing.stages
+    if _req_timing.stack:
+        name, since = _req_timing.stack[-1]
+        stages[name] = stages.get(name, 0.0) + (end - since)
+    _req_timing.stack = None
+    _req_timing.started = None
+    # human_delay is intentional sleeping, so it doesn't count towards "slow"
+    busy = total - stages.get("human_delay", 0.0)
+    if busy >= SLOW_REQUEST_SECONDS:
+        entry = {
+            "ts_utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+            "path": label,
+            "total_s": round(total, 3),
+            "busy_s": round(busy, 3),
+            "stages": {k: round(v, 3) for k, v in sorted(stages.items(), key=lambda kv: -kv[1])},
+        }
+        slow_requests.append(entry)
+        print("🐢 Slow request:", entry)
+
+@app.before_request
+def _start_request_timing():
+    begin_timing()
+
+@app.after_request
+def _finish_request_timing(response):
+    if request.path.startswith("/debug/"):
+        _req_timing.started = None
+        _req_timing.stack = None
+    end_timing(request.path)
+    return response
+
+def format_slow_requests(limit: int = 5) -> str:
+    if not slow_requests:
+        return "No slow requests logged."
+    lines = []
+    for e in list(slow_requests)[-limit:]:
+        stages = " ".join(f"{k}={v:.2f}s" for k, v in e["stages"].items())
+        lines.append(f"{e['ts_utc']} {e['path']} busy={e['busy_s']:.2f}s total={e['total_s']:.2f}s {stages}")
+    return "\n".join(lines)
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack at a fixed interval and aggregates them
+    in collapsed "a;b;c count" form, ready for flamegraph.pl / speedscope.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.running = False
+        self.samples = 0
+
+    def start(self, seconds: float, interval: float = PROFILE_INTERVAL_SECONDS) -> bool:
+        with self.lock:
+            if self.running:
+                return False
+            self.running = True
+            self.counts = Counter()
+            self.samples = 0
+        seconds = max(0.1, min(float(seconds), PROFILE_MAX_SECONDS))
+        threading.Thread(target=self._run, args=(seconds, interval), daemon=True).start()
+        return True
+
+    def _run(self, seconds: float, interval: float):
+        own = threading.get_ident()
+        until = time.perf_counter() + seconds
+        try:
+            while time.perf_counter() < until:
+                for tid, frame in sys._current_frames().items():
+                    if tid == own:
+                        continue
+                    parts = []
+                    while frame is not None:
+                        code = frame.f_code
+                        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                        frame = frame.f_back
+                    self.counts[";".join(reversed(parts))] += 1
+                self.samples += 1
+                time.sleep(interval)
+        finally:
+            self.running = False
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in self.counts.most_common())
+
+profiler = SamplingProfiler()
+
 # ============================================================
 # 2) TELEGRAM HELPERS
 # ============================================================
 def tg_post(method: str, payload: dict):
     try:
-        return requests.post(f"{BASE_URL}/{method}", json=payload, timeout=12).json()
+        with timed("telegram"):
+            return http.post(f"{tenant()['base_url']}/{method}", json=payload, timeout=12).json()
     except Exception:
         return None
 
@@ -168,17 +676,96 @@ def notify_admin(text: str, current_uid: Optional[int] = None):
     Important: never send admin alerts to the same uid that is chatting.
     This avoids the common misconfig where ADMIN_CHAT_ID accidentally equals a test user id.
     """
-    if not ADMIN_CHAT_ID or int(ADMIN_CHAT_ID) == 0:
+    admin_chat_id = tenant()["admin_chat_id"]
+    if not admin_chat_id:
+        return
+    if current_uid is not None and int(admin_chat_id) == int(current_uid):
+        return
+    send_message(admin_chat_id, f"[ALERT] {text}")
+
+# Hot-lead alerts are buffered per tenant and sent as one digest per ALERT_DIGEST_SECONDS.
+_alert_lock = threading.Lock()
+_alert_buffers = {}   # tenant id -> [{"ts", "uid", "name", "link_stage", "hesitation", "text"}]
+
+def is_urgent_alert(u: dict) -> bool:
+    """
+    Link already sent but the lead keeps hesitating: worth a takeover right now.
+    """
+    return u.get("link_stage", 0) == 2 and u.get("hesitation_score", 0) >= ALERT_URGENT_HESITATION
+
+def queue_admin_alert(text: str, uid: int, u: dict):
+    admin_chat_id = tenant()["admin_chat_id"]
+    if not admin_chat_id or int(admin_chat_id) == int(uid):
         return
-    if current_uid is not None and int(ADMIN_CHAT_ID) == int(current_uid):
+    if ALERT_DIGEST_SECONDS <= 0 or is_urgent_alert(u):
+        notify_admin(text, current_uid=uid)
         return
-    send_message(ADMIN_CHAT_ID, f"[ALERT] {text}")
+    with _alert_lock:
+        _alert_buffers.setdefault(tenant()["id"], []).append({
+            "ts": clock.now(),
+            "uid": uid,
+            "name": (u.get("profile", {}) or {}).get("name", ""),
+            "link_stage": u.get("link_stage", 0),
+            "hesitation": u.get("hesitation_score", 0),
+            "text": text,
+        })
+
+def build_alert_digest(alerts: list, now: float) -> str:
+    leads = {}
+    for a in alerts:
+        lead = leads.setdefault(a["uid"], dict(a, count=0))
+        lead.update(a, count=lead["count"] + 1)   # keep the latest values per uid
+    ranked = sorted(leads.values(), key=lambda l: (l["link_stage"], l["hesitation"], l["count"]), reverse=True)
+    # window runs from the first buffered alert to this flush
+    minutes = max(1, round((now - alerts[0]["ts"]) / 60))
+
+    lines = [f"{len(alerts)} hot alerts from {len(leads)} leads in the last ~{minutes} min"]
+    for l in ranked[:ALERT_DIGEST_TOP]:
+        name = f"{l['name']} " if l["name"] else ""
+        lines.append(
+            f"{name}uid={l['uid']} link_stage={l['link_stage']} hesitation={l['hesitation']} alerts={l['count']}"
+        )
+    if len(ranked) > ALERT_DIGEST_TOP:
+        lines.append("others: " + " ".join(str(l["uid"]) for l in ranked[ALERT_DIGEST_TOP:]))
+    lines.append("/takeover <uid> on")
+    return "\n".join(lines)
+
+def flush_alert_digests(force: bool = False, only: Optional[str] = None) -> int:
+    now = clock.now()
+    due = {}
+    with _alert_lock:
+        for tid, alerts in list(_alert_buffers.items()):
+            if only is not None and tid != only:
+                continue
+            if alerts and (force or now - alerts[0]["ts"] >= ALERT_DIGEST_SECONDS):
+                due[tid] = _alert_buffers.pop(tid)
+    for tid, alerts in due.items():
+        t = tenants.get(tid)
+        if t is None:
+            continue
+        with using_tenant(t):
+            send_message(t["admin_chat_id"], f"[DIGEST] {build_alert_digest(alerts, now)}")
+    return len(due)
+
+def alert_digester():
+    while True:
+        time.sleep(min(30, max(1, ALERT_DIGEST_SECONDS // 10)))
+        try:
+            flush_alert_digests()
+        except Exception as e:
+            print("❌ Alert digest error:", e)
+
+def start_alert_digester():
+    if ALERT_DIGEST_SECONDS > 0:
+        threading.Thread(target=alert_digester, name="alert-digester", daemon=True).start()
+        # send whatever is still buffered on a clean shutdown
+        atexit.register(flush_alert_digests, force=True)
 
 # ============================================================
 # 2.5) SHEET LOGGING HELPERS
 # ============================================================
 def _utc_ts() -> str:
-    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(time.time()))
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(clock.now()))
 
 def calculate_status(u: dict) -> str:
     if u.get("link_stage", 0) == 2:
@@ -201,6 +788,28 @@ def sheet_log(event: str, uid: int, u: dict, text_preview: str = ""):
         if len(preview) > 140:
             preview = preview[:140] + "…"
 
+        tid = tenant()["id"]
+        if status_ws is not None:
+            # non-default tenants share the tab, so their rows are keyed "<tenant>:<uid>"
+            key = str(uid) if tid == DEFAULT_TENANT else f"{tid}:{uid}"
+            mark_status_dirty(key, [
+                key,
+                name,
+                calculate_status(u),
+                u.get("intent", ""),
+                u.get("phase", ""),
+                u.get("link_stage", ""),
+                u.get("hesitation_score", ""),
+                u.get("messages", ""),
+                u.get("followups_sent_today", ""),
+                last_seen_utc,
+                event,
+                _utc_ts(),
+                preview,
+                tid,
+            ])
+            return
+
         row = [
             _utc_ts(),
             event,
@@ -215,22 +824,118 @@ def sheet_log(event: str, uid: int, u: dict, text_preview: str = ""):
             last_seen_utc,
             preview,
             calculate_status(u),
+            tid,
         ]
-        sheet.append_row(row, value_input_option="USER_ENTERED")
+        with timed("sheets"):
+            sheet.append_row(row, value_input_option="USER_ENTERED")
     except Exception as e:
         print("❌ Sheet logging error:", e)
 
+# Status mode: rows are snapshotted here and written in one batch_update per flush.
+_status_lock = threading.Lock()
+_status_flush_lock = threading.Lock()
+_status_dirty = {}     # status key -> latest row snapshot
+_status_index = None   # status key (column A) -> sheet row number
+_status_next_row = 2
+
+def mark_status_dirty(key: str, row: list):
+    with _status_lock:
+        _status_dirty[key] = row
+
+def load_status_index():
+    """
+    uid -> row map, from the local cache file if present, otherwise rebuilt from column A.
+    """
+    global _status_index, _status_next_row
+    if _status_index is not None:
+        return
+    index = None
+    if os.path.exists(SHEET_INDEX_PATH):
+        try:
+            with open(SHEET_INDEX_PATH) as f:
+                index = {str(k): int(v) for k, v in json.load(f).items()}
+        except Exception as e:
+            print("❌ Sheet index cache unreadable, rebuilding:", e)
+    if index is None:
+        index = {}
+        for i, val in enumerate(status_ws.col_values(1)[1:], start=2):
+            if val:
+                index[str(val)] = i
+    _status_index = index
+    _status_next_row = max(index.values(), default=1) + 1
+
+def save_status_index():
+    tmp = SHEET_INDEX_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(_status_index, f)
+    os.replace(tmp, SHEET_INDEX_PATH)
+
+def flush_status_rows() -> int:
+    if status_ws is None:
+        return 0
+    # the flusher thread and /cron both flush; row allocation, the write and the
+    # index save must not interleave or two uids could get the same row
+    with _status_flush_lock:
+        return _flush_status_rows()
+
+def _flush_status_rows() -> int:
+    global _status_next_row
+    with _status_lock:
+        dirty = dict(_status_dirty)
+        _status_dirty.clear()
+    if not dirty:
+        return 0
+    try:
+        load_status_index()
+        new_uids = False
+        data = []
+        last_col = chr(ord("A") + len(STATUS_HEADER) - 1)
+        for key, row in dirty.items():
+            if key not in _status_index:
+                _status_index[key] = _status_next_row
+                _status_next_row += 1
+                new_uids = True
+            r = _status_index[key]
+            data.append({"range": f"A{r}:{last_col}{r}", "values": [row]})
+
+        with timed("sheets"):
+            if _status_next_row - 1 > status_ws.row_count:
+                status_ws.add_rows(max(500, _status_next_row - 1 - status_ws.row_count))
+            status_ws.batch_update(data, value_input_option="USER_ENTERED")
+        if new_uids:
+            save_status_index()
+        return len(data)
+    except Exception as e:
+        # put the rows back unless a newer snapshot arrived meanwhile
+        with _status_lock:
+            for key, row in dirty.items():
+                _status_dirty.setdefault(key, row)
+        print("❌ Sheet status flush error:", e)
+        return 0
+
+def sheet_flusher():
+    while True:
+        time.sleep(SHEET_FLUSH_SECONDS)
+        flush_status_rows()
+
+def start_sheet_flusher():
+    if status_ws is not None:
+        threading.Thread(target=sheet_flusher, name="sheet-flusher", daemon=True).start()
+        # write the last dirty rows on a clean shutdown
+        atexit.register(flush_status_rows)
+
 # ============================================================
 # 3) HOUSEKEEPING: DE-DUP + RATE LIMIT
 # ============================================================
 def cleanup_processed():
-    now = time.time()
-    stale = [k for k, ts in processed.items() if (now - ts) > PROCESSED_TTL_SECONDS]
-    for k in stale:
-        processed.pop(k, None)
+    now = clock.now()
+    with _processed_lock:
+        stale = [k for k, ts in processed.items() if (now - ts) > PROCESSED_TTL_SECONDS]
+        for k in stale:
+            processed.pop(k, None)
 
 def allow_rate(u: dict) -> bool:
-    now = time.time()
+    now = clock.now()
     window = u.setdefault("rate_window", [])
     window = [t for t in window if now - t < 60]
     u["rate_window"] = window
@@ -246,22 +951,26 @@ def pre_filler():
     return random.choice(["Hmm…", "Wait…", "Okay hold on…", "Lol okay…", "Mmm…", "Alright…"])
 
 def wait_human(chat_id: int, total_seconds: float):
+    with timed("human_delay"):
+        _wait_human(chat_id, total_seconds)
+
+def _wait_human(chat_id: int, total_seconds: float):
     total_seconds = max(0.0, float(total_seconds))
     total_seconds = min(total_seconds, MAX_DELAY_SECONDS)
 
     seen_delay = min(random.uniform(0.4, 2.2), total_seconds)
-    time.sleep(seen_delay)
+    clock.sleep(seen_delay)
     remaining = total_seconds - seen_delay
 
     while remaining > 0:
         burst = min(random.uniform(1.6, 4.6), remaining)
         send_typing(chat_id)
-        time.sleep(burst)
+        clock.sleep(burst)
         remaining -= burst
         if remaining <= 0:
             break
         pause = min(random.uniform(0.4, 1.6), remaining)
-        time.sleep(pause)
+        clock.sleep(pause)
         remaining -= pause
 
 def human_delay(intent: str, phase: int, priority: bool) -> float:
@@ -332,7 +1041,7 @@ FAQ_MAP = {
 FAQ_REPLIES = {
     "price": "It’s the normal sub price on the page, you’ll see it before you confirm anything.",
     "safe": "Yep, it’s official and you stay inside the platform. You can cancel anytime.",
-    "what_you_get": "On Fanvue it’s the full private side, private drops, customs, and real replies from Avelyn.",
+    "what_you_get": "On Fanvue it’s the full private side, private drops, customs, and real replies from {persona}.",
     "cancel": "You can cancel anytime on the platform, no drama.",
 }
 
@@ -354,6 +1063,8 @@ def detect_intent(text: str) -> str:
         return "buyer_intent"
     if t.strip() in loweffort or len(t.strip()) <= 3:
         return "low_effort"
+    if classify_intent(t) == "buyer_intent":
+        return "buyer_intent"
     return "casual"
 
 def match_faq(text: str):
@@ -361,7 +1072,7 @@ def match_faq(text: str):
     for key, kws in FAQ_MAP.items():
         if any(k in t for k in kws):
             return key
-    return None
+    return classify_faq(t)
 
 def is_link_ask(text: str) -> bool:
     t = text.lower().strip()
@@ -389,24 +1100,191 @@ def can_mention_promo(u: dict) -> bool:
     if not FOUNDERS_PROMO_ACTIVE:
         return False
     last = u.get("last_promo_mention_ts", 0.0)
-    return (time.time() - last) > (PROMO_MENTION_COOLDOWN_HOURS * 3600)
+    return (clock.now() - last) > (PROMO_MENTION_COOLDOWN_HOURS * 3600)
 
 def mark_promo_mentioned(u: dict):
-    u["last_promo_mention_ts"] = time.time()
+    u["last_promo_mention_ts"] = clock.now()
+
+# ============================================================
+# 5.5) LOCAL CLASSIFIER (fallback when the keyword rules miss)
+# Char n-gram TF-IDF, nearest labeled example by cosine. No network.
+# ============================================================
+FAQ_CLASSIFIER_THRESHOLD = float(os.environ.get("FAQ_CLASSIFIER_THRESHOLD", "0.5"))
+# a false buyer_intent triggers the funnel pitch, an admin alert and the hot route
+INTENT_CLASSIFIER_THRESHOLD = float(os.environ.get("INTENT_CLASSIFIER_THRESHOLD", "0.6"))
+CLASSIFIER_MARGIN = 0.12   # best label must beat "none" by this much
+
+FAQ_EXAMPLES = {
+    "price": [
+        "how much is it", "how much does it cost", "whats the price", "what does it cost",
+        "is it expensive", "how much per month", "hw much", "how mich is it", "whats it cost",
+        "price?", "how much r u", "how much is the sub", "whats the monthly fee",
+    ],
+    "safe": [
+        "is this real", "is it legit", "is this a scam", "are you real", "is it safe to pay",
+        "can i trust this", "is this fake", "is it legit or scam", "is it secure",
+        "are you a bot", "is this really her", "r u real",
+    ],
+    "what_you_get": [
+        "what do i get", "whats inside", "what do you post there", "what kind of content",
+        "what will i see", "what is on your page", "whats on there", "what do u post",
+        "what do i get if i sub", "what do you share", "what's on the page",
+    ],
+    "cancel": [
+        "can i cancel", "how do i cancel", "can i get a refund", "can i stop anytime",
+        "how to unsubscribe", "can i cancel whenever", "is it a contract", "can i quit later",
+    ],
+    "link": [
+        "send me the link", "where can i find you", "wheres the link", "drop the link",
+        "give me your page", "how do i join", "where do i sign up", "linkk pls", "send lnk",
+    ],
+    "bio": [
+        "where are you from", "what happened to your eye", "tell me about yourself",
+        "whats your story", "how did you get the scar", "who are you really",
+        "where did you grow up", "how old are you",
+    ],
+    "promo": [
+        "any discount", "is there a deal", "any promo code", "got any offers", "any sale",
+        "is there a discount for new members", "any coupon",
+    ],
+    "none": [
+        "hey how are you", "whats up", "good morning", "im bored", "what are you doing",
+        "i just got back from the gym", "lol", "thats cool", "nice", "how was your day",
+        "i like your pics", "you look great", "i play football", "tell me something",
+        "i am tired", "what music do you like", "haha ok", "where is she now", "thanks",
+        "ok cool", "i live in london", "do you play padel", "do you like anime",
+        # hard negatives: share n-grams with FAQ examples but are small talk
+        "how much do you lift", "how much do you sleep", "how much do you like music",
+        "how much did you run today", "how much time do you spend at the gym",
+        "can i stop you for a sec", "can i come over", "can i ask you something",
+        "what do you do for work", "what do you do all day", "what do you think",
+        "what do you do on weekends", "how can i get fit", "is it real hot there",
+        "where can i find good food", "what is on your mind", "what kind of music",
+    ],
+}
+
+INTENT_EXAMPLES = {
+    "buyer_intent": [
+        "i want to see more of you", "where can i see more of you", "show me more of you",
+        "i want the private stuff", "how do i get access", "i wanna sign up",
+        "i want customs", "can i buy a custom", "i want to support her", "take my money",
+        "i want your private content", "how can i get more of you", "i wanna subscribe",
+        "send me pix", "i want your private side", "how do i get your private content",
+    ],
+    "none": [
+        "hey how are you", "whats up", "good morning", "im bored", "what are you doing",
+        "i just got back from the gym", "thats cool", "how was your day", "i play football",
+        "what music do you like", "haha ok", "i live in london", "do you play padel",
+        "i am tired", "tell me about your day", "nice weather today", "i like cars",
+        "what do you do for fun", "where are you from", "how old are you",
+        # hard negatives: "see", "show", "more", "get" outside a buying context
+        "i want to see you laugh", "i want to see the game tonight", "i want to see a movie",
+        "i want to see more of the world", "show me your cat", "show me your gym",
+        "show me your city", "i want to get better at padel", "how can i get better at the gym",
+        "i want more coffee", "can i see your padel racket", "i want to see the sea",
+    ],
+}
+
+def _normalize_for_ngrams(text: str) -> str:
+    t = text.lower()
+    t = re.sub(r"[’']", "", t)
+    t = re.sub(r"[^a-z0-9%\s]", " ", t)
+    t = re.sub(r"(.)\1{2,}", r"\1\1", t)   # "sooooo" -> "soo"
+    return " " + " ".join(t.split()) + " "
+
+def _char_ngrams(text: str, sizes=(2, 3, 4)) -> Counter:
+    t = _normalize_for_ngrams(text)
+    grams = Counter()
+    for n in sizes:
+        for i in range(len(t) - n + 1):
+            grams[t[i:i + n]] += 1
+    return grams
+
+class NgramClassifier:
+    """
+    TF-IDF over char n-grams, scored against every labeled example with one
+    matrix-vector product; a label's score is its best matching example.
+    """
+    def __init__(self, examples: dict):
+        docs, labels = [], []
+        for label, texts in examples.items():
+            for text in texts:
+                docs.append(_char_ngrams(text))
+                labels.append(label)
+
+        self.vocab = {}
+        for grams in docs:
+            for g in grams:
+                self.vocab.setdefault(g, len(self.vocab))
+        df = np.zeros(len(self.vocab), dtype=np.float32)
+        for grams in docs:
+            df[[self.vocab[g] for g in grams]] += 1
+        self.idf = np.log((1 + len(docs)) / (1 + df)) + 1
+
+        m = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, grams in enumerate(docs):
+            for g, c in grams.items():
+                m[row, self.vocab[g]] = c
+        self.matrix = self._normalize(m * self.idf)
+
+        self.labels = sorted(set(labels))
+        label_idx = np.array([self.labels.index(l) for l in labels])
+        order = np.argsort(label_idx, kind="stable")
+        self.matrix = self.matrix[order]
+        self.starts = np.searchsorted(label_idx[order], np.arange(len(self.labels)))
+
+    @staticmethod
+    def _normalize(m):
+        norms = np.linalg.norm(m, axis=-1, keepdims=True)
+        return m / np.maximum(norms, 1e-9)
+
+    def vectorize(self, text: str):
+        v = np.zeros(len(self.vocab), dtype=np.float32)
+        for g, c in _char_ngrams(text).items():
+            i = self.vocab.get(g)
+            if i is not None:
+                v[i] = c
+        return self._normalize(v * self.idf)
+
+    def scores(self, text: str) -> dict:
+        sims = self.matrix @ self.vectorize(text)
+        best = np.maximum.reduceat(sims, self.starts)
+        return dict(zip(self.labels, best.tolist()))
+
+    def predict(self, text: str, threshold: float, margin: float = CLASSIFIER_MARGIN):
+        sc = self.scores(text)
+        none = sc.pop("none", 0.0)
+        if not sc:
+            return None
+        label, best = max(sc.items(), key=lambda kv: kv[1])
+        if best < threshold or best - none < margin:
+            return None
+        return label
+
+faq_classifier = NgramClassifier(FAQ_EXAMPLES)
+intent_classifier = NgramClassifier(INTENT_EXAMPLES)
+
+def classify_faq(text: str):
+    return faq_classifier.predict(text, FAQ_CLASSIFIER_THRESHOLD)
+
+def classify_intent(text: str):
+    return intent_classifier.predict(text, INTENT_CLASSIFIER_THRESHOLD)
 
 # ============================================================
 # 6) USER STATE + ADMIN
 # ============================================================
 def should_alert(u: dict) -> bool:
-    return (time.time() - u.get("last_alert_ts", 0.0)) > (ALERT_COOLDOWN_MINUTES * 60)
+    return (clock.now() - u.get("last_alert_ts", 0.0)) > (ALERT_COOLDOWN_MINUTES * 60)
 
 def mark_alert(u: dict):
-    u["last_alert_ts"] = time.time()
+    u["last_alert_ts"] = clock.now()
 
 def get_user(uid: int):
-    if uid not in memory:
-        now = time.time()
-        memory[uid] = {
+    memory = tenant()["memory"]
+    u = memory.get(uid)
+    if u is None:
+        now = clock.now()
+        u = {
             "messages": 0,
             "phase": 1,
             "intent": "casual",
@@ -441,17 +1319,20 @@ def get_user(uid: int):
             "followups_sent_today": 0,
             "followup_day_key": time.strftime("%Y%m%d", time.gmtime(now)),
         }
-    return memory[uid]
+        memory[uid] = u
+    return u
 
 def handle_admin_command(text: str, chat_id: int):
-    if not ADMIN_CHAT_ID or int(ADMIN_CHAT_ID) == 0 or chat_id != ADMIN_CHAT_ID:
+    admin_chat_id = tenant()["admin_chat_id"]
+    if not admin_chat_id or chat_id != admin_chat_id:
         return False
+    memory = tenant()["memory"]
 
     parts = text.strip().split()
     cmd = parts[0].lower()
 
     def usage():
-        send_message(chat_id, "Commands:\n/status <uid>\n/takeover <uid> on|off\n/reset <uid>\n/force_link <uid>")
+        send_message(chat_id, "Commands:\n/status <uid>\n/takeover <uid> on|off\n/reset <uid>\n/force_link <uid>\n/routes\n/profile <seconds>\n/slow\n/digest")
 
     if cmd == "/status":
         if len(parts) < 2:
@@ -476,8 +1357,9 @@ def handle_admin_command(text: str, chat_id: int):
             return True
         uid = int(parts[1])
         mode = parts[2].lower()
-        u = get_user(uid)
-        u["takeover"] = (mode == "on")
+        with memory.holding(uid):
+            u = get_user(uid)
+            u["takeover"] = (mode == "on")
         send_message(chat_id, f"takeover for {uid} = {u['takeover']}")
         return True
 
@@ -495,22 +1377,48 @@ def handle_admin_command(text: str, chat_id: int):
             usage()
             return True
         uid = int(parts[1])
-        u = get_user(uid)
-        u["link_stage"] = 2
-        u["last_link_ts"] = time.time()
-        send_message(uid, FANVUE_LINK)
+        with memory.holding(uid):
+            u = get_user(uid)
+            u["link_stage"] = 2
+            u["last_link_ts"] = clock.now()
+        send_message(uid, tenant()["fanvue_link"])
         send_message(chat_id, f"sent link to {uid}")
         return True
 
+    if cmd == "/routes":
+        send_message(chat_id, format_route_stats())
+        return True
+
+    if cmd == "/profile":
+        seconds = float(parts[1]) if len(parts) > 1 else 10.0
+        if not profiler.start(seconds):
+            send_message(chat_id, "profiler already running")
+            return True
+        send_message(chat_id, f"profiling for {seconds:.0f}s, fetch the dump from /debug/profile")
+        return True
+
+    if cmd == "/slow":
+        send_message(chat_id, format_slow_requests())
+        return True
+
+    if cmd == "/digest":
+        if not flush_alert_digests(force=True, only=tenant()["id"]):
+            send_message(chat_id, "No pending alerts.")
+        return True
+
     return False
 
 # ============================================================
 # 7) ONBOARDING + PROFILE EXTRACTION
 # ============================================================
 def onboarding_message(u: dict) -> str:
+    t = tenant()
+    if t["onboarding"]:
+        return t["onboarding"]
+    # generic fallback for tenants without their own "onboarding" text
     return (
-        "Hey 🙂 I’m Avelyn’s assistant. I help manage her DMs so she can stay focused on training and padel.\n"
-        "What are you looking for today, private content, customs, or a real chat with her?"
+        f"Hey 🙂 I’m {t['persona_short']}’s assistant and I help manage these DMs.\n"
+        f"What are you looking for today, private content, customs, or a real chat with {t['persona_short']}?"
     )
 
 def extract_profile(u: dict, user_text: str):
@@ -554,8 +1462,8 @@ def funnel_reply(u: dict, user_text: str):
     # Direct link ask
     if is_link_ask(t):
         u["link_stage"] = 2
-        u["last_link_ts"] = time.time()
-        msg = f"Here you go 👀\n{FANVUE_LINK}"
+        u["last_link_ts"] = clock.now()
+        msg = f"Here you go 👀\n{tenant()['fanvue_link']}"
         if can_mention_promo(u) and FOUNDERS_PROMO_ACTIVE:
             mark_promo_mentioned(u)
             msg = msg + "\n" + founders_promo_line() + "\n" + founders_bonus_line()
@@ -566,7 +1474,7 @@ def funnel_reply(u: dict, user_text: str):
         u["link_stage"] = max(u["link_stage"], 1)
         msg = (
             "I can’t do explicit stuff here, and we don’t send private pics on Telegram.\n"
-            "If you want the private side and customs, Fanvue is where Avelyn keeps it."
+            f"If you want the private side and customs, Fanvue is where {tenant()['persona_short']} keeps it."
         )
         if can_mention_promo(u) and FOUNDERS_PROMO_ACTIVE:
             mark_promo_mentioned(u)
@@ -600,7 +1508,7 @@ def funnel_reply(u: dict, user_text: str):
 # Follow-ups keep contact until link_stage == 2
 # ============================================================
 def day_key_now() -> str:
-    return time.strftime("%Y%m%d", time.gmtime(time.time()))
+    return time.strftime("%Y%m%d", time.gmtime(clock.now()))
 
 def reset_daily_followups(u: dict):
     dk = day_key_now()
@@ -609,7 +1517,7 @@ def reset_daily_followups(u: dict):
         u["followups_sent_today"] = 0
 
 def eligible_for_reengage(u: dict) -> bool:
-    now_ts = time.time()
+    now_ts = clock.now()
     last_seen = u.get("last_seen_ts", now_ts)
     last_ping = u.get("last_reengage_ts", 0.0)
     inactive_hours = (now_ts - last_seen) / 3600.0
@@ -641,7 +1549,7 @@ def eligible_for_followup(u: dict):
     if last_seen > last_bot:
         return None
 
-    now_ts = time.time()
+    now_ts = clock.now()
     minutes_since_bot = (now_ts - last_bot) / 60.0
     count = u.get("followups_sent_today", 0)
 
@@ -661,7 +1569,7 @@ def build_followup_message(u: dict, stage: int) -> str:
     if stage == 1:
         if u.get("link_stage", 0) >= 1:
             return intro + "quick check, were you still curious about Fanvue, or were you looking for something specific?"
-        return intro + "what were you looking for today, private content or a real chat with Avelyn?"
+        return intro + f"what were you looking for today, private content or a real chat with {tenant()['persona_short']}?"
 
     if stage == 2:
         msg = intro + "no pressure, but if you tell me what you want, I’ll point you the right way."
@@ -676,15 +1584,15 @@ def build_followup_message(u: dict, stage: int) -> str:
         msg = msg + " " + founders_bonus_line()
     return msg
 
-@app.route("/cron", methods=["GET"])
-def cron():
-    if CRON_SECRET:
-        token = request.args.get("token", "")
-        if token != CRON_SECRET:
-            abort(403)
+def run_followups(now: float) -> int:
+    """
+    One follow-up / re-engage pass over the current tenant's users.
+    """
+    memory = tenant()["memory"]
+    memory.spill_idle(HOT_IDLE_HOURS * 3600, now)
 
     sent = 0
-    for uid, u in list(memory.items()):
+    for uid, u in memory.due_items(now):
         if u.get("takeover"):
             continue
 
@@ -693,7 +1601,7 @@ def cron():
             msg = sanitize_reply(build_followup_message(u, stage))
             send_message(uid, msg)
             u["followups_sent_today"] = u.get("followups_sent_today", 0) + 1
-            u["last_bot_ts"] = time.time()
+            u["last_bot_ts"] = clock.now()
             sheet_log("followup", uid, u, msg)
             sent += 1
             if sent >= 25:
@@ -702,14 +1610,29 @@ def cron():
         if eligible_for_reengage(u):
             msg = sanitize_reply(build_reengage_message(u))
             send_message(uid, msg)
-            u["last_reengage_ts"] = time.time()
-            u["last_bot_ts"] = time.time()
+            u["last_reengage_ts"] = clock.now()
+            u["last_bot_ts"] = clock.now()
             sheet_log("reengage", uid, u, msg)
             sent += 1
             if sent >= 25:
                 break
 
-    return {"ok": True, "sent": sent}
+    return sent
+
+@app.route("/cron", methods=["GET"])
+def cron():
+    require_cron_secret()
+
+    now = clock.now()
+    sent = {}
+    for tid, t in tenants.items():
+        with using_tenant(t):
+            sent[tid] = run_followups(now)
+            t["memory"].checkpoint()
+
+    flush_alert_digests()
+    flush_status_rows()
+    return {"ok": True, "sent": sum(sent.values()), "per_tenant": sent}
 
 # ============================================================
 # 10) GPT RESPONSE (assistant identity, empathy, reacts to user)
@@ -739,9 +1662,12 @@ def build_system_prompt(u: dict) -> str:
             "Mention this only when the user asks about deals, discounts, founders, bonus, or when they clearly hesitate about joining."
         )
 
+    t = tenant()
+    name = t["persona_short"]
+
     return f"""
-You are Avelyn Noira's assistant, managing her Telegram DMs.
-You are NOT Avelyn. You are warm, human, and responsive.
+You are {t["persona"]}'s assistant, managing her Telegram DMs.
+You are NOT {name}. You are warm, human, and responsive.
 
 LANGUAGE:
 Only write in English.
@@ -752,7 +1678,7 @@ No lists. No bullets. Do not use dash separators or em dashes.
 Do not sound like an AI assistant. No lectures. No generic platform talk.
 
 ASSISTANT IDENTITY:
-In the first 2 messages with a new user, make it clear you manage DMs and Avelyn checks in when she can.
+In the first 2 messages with a new user, make it clear you manage DMs and {name} checks in when she can.
 Say she reads highlighted messages when possible, but do not claim she is watching live.
 
 EMPATHY:
@@ -764,7 +1690,7 @@ No explicit content.
 
 GOAL:
 Help users understand what Telegram is for and what Fanvue unlocks.
-If they ask what’s inside Fanvue, explain benefits clearly: private drops, customs, and real replies from Avelyn.
+If they ask what’s inside Fanvue, explain benefits clearly: private drops, customs, and real replies from {name}.
 If they ask for the link, give it immediately.
 If they ask for explicit content, keep it classy and redirect to Fanvue without explicit detail.
 
@@ -772,7 +1698,7 @@ PROMO:
 {promo_context}
 
 BIO CONTEXT (use only if asked about her story, scar, origin, background):
-{AVELYN_BIO}
+{t["bio"]}
 
 USER CONTEXT:
 Intent: {u.get("intent")}
@@ -784,13 +1710,65 @@ Micro memory: {memory_line}
 Write the next message now.
 """.strip()
 
+ROUTES = {
+    "fast": {"model": MODEL_FAST, "max_output_tokens": MAX_OUTPUT_TOKENS_FAST},
+    "default": {"model": MODEL, "max_output_tokens": MAX_OUTPUT_TOKENS},
+    "hot": {"model": MODEL_HOT, "max_output_tokens": MAX_OUTPUT_TOKENS_HOT},
+}
+
+_route_lock = threading.Lock()
+route_stats = {}  # route -> {"calls", "input_tokens", "output_tokens", "latency_s"}
+
+def pick_route(u: dict) -> str:
+    """
+    Hot leads (buyer intent, late phase, hesitating) keep the full model and budget.
+    Early low-effort chit-chat goes to the cheap tier with a short budget.
+    """
+    if u.get("intent") == "buyer_intent" or u.get("phase", 1) >= 3:
+        return "hot"
+    if u.get("hesitation_score", 0) >= 4 or u.get("link_stage", 0) >= 1:
+        return "hot"
+    if u.get("intent") == "low_effort":
+        return "fast"
+    return "default"
+
+def record_route_usage(route: str, resp, latency_s: float):
+    usage = getattr(resp, "usage", None)
+    input_tokens = (getattr(usage, "input_tokens", 0) or 0) if usage is not None else 0
+    output_tokens = (getattr(usage, "output_tokens", 0) or 0) if usage is not None else 0
+    with _route_lock:
+        st = route_stats.setdefault(route, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_s": 0.0})
+        st["calls"] += 1
+        st["latency_s"] += latency_s
+        st["input_tokens"] += input_tokens
+        st["output_tokens"] += output_tokens
+
+def format_route_stats() -> str:
+    with _route_lock:
+        snapshot = {route: dict(st) for route, st in route_stats.items()}
+    if not snapshot:
+        return "No GPT calls yet."
+    lines = []
+    for route, st in sorted(snapshot.items()):
+        calls = max(1, st["calls"])
+        lines.append("{} ({}): calls={} avg_in={:.0f} avg_out={:.0f} avg_latency={:.2f}s".format(
+            route, ROUTES.get(route, {}).get("model", "?"), st["calls"],
+            st["input_tokens"] / calls, st["output_tokens"] / calls, st["latency_s"] / calls,
+        ))
+    return "\n".join(lines)
+
 def gpt_reply(u: dict) -> str:
     system_prompt = build_system_prompt(u)
-    resp = client.responses.create(
-        model=MODEL,
-        max_output_tokens=MAX_OUTPUT_TOKENS,
-        input=[{"role": "system", "content": system_prompt}, *u["history"]],
-    )
+    route = pick_route(u)
+    cfg = ROUTES[route]
+    started = time.perf_counter()
+    with timed("openai"):
+        resp = client.responses.create(
+            model=cfg["model"],
+            max_output_tokens=cfg["max_output_tokens"],
+            input=[{"role": "system", "content": system_prompt}, *u["history"]],
+        )
+    record_route_usage(route, resp, time.perf_counter() - started)
     reply = (resp.output_text or "").strip()
     reply = maybe_shorten(reply)
     reply = maybe_typo_curated(reply)
@@ -805,51 +1783,102 @@ def gpt_reply(u: dict) -> str:
 def health():
     return {"ok": True}, 200
 
+# ============================================================
+# 10.6) DEBUG (profiler dump + slow log, CRON_SECRET protected)
+# ============================================================
+def require_cron_secret():
+    if CRON_SECRET:
+        token = request.args.get("token", "")
+        if token != CRON_SECRET:
+            abort(403)
+
+@app.route("/debug/profile", methods=["GET"])
+def debug_profile():
+    """
+    ?seconds=N profiles for N seconds and returns the dump.
+    Without it, returns the last dump (e.g. from the /profile admin command).
+    """
+    require_cron_secret()
+    seconds = request.args.get("seconds")
+    if seconds:
+        if not profiler.start(float(seconds)):
+            return {"ok": False, "error": "profiler already running"}, 409
+        while profiler.running:
+            time.sleep(0.05)
+    elif profiler.running:
+        return {"ok": False, "error": "profiler still running"}, 409
+    return profiler.folded() + "\n", 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+@app.route("/debug/slow", methods=["GET"])
+def debug_slow():
+    require_cron_secret()
+    return {"ok": True, "threshold_s": SLOW_REQUEST_SECONDS, "requests": list(slow_requests)}
+
 # ============================================================
 # 11) WEBHOOK
 # ============================================================
-@app.route("/webhook", methods=["POST"])
-def webhook():
+def handle_update(update: dict):
     cleanup_processed()
 
-    update = request.get_json(silent=True) or {}
     msg = update.get("message")
     if not msg:
-        return "ok"
+        return
 
     chat_id = msg["chat"]["id"]
     uid = msg.get("from", {}).get("id", chat_id)
 
     text = (msg.get("text") or "").strip()
     if not text:
-        return "ok"
+        return
 
     # Ignore slash commands for normal users
     if text.startswith("/"):
         if handle_admin_command(text, chat_id):
-            return "ok"
-        return "ok"
+            return
+        return
 
     # De-dup key using update_id + message_id
     update_id = update.get("update_id")
     message_id = msg.get("message_id")
-    dedup_key = f"{uid}:{update_id}:{message_id}"
-    if dedup_key in processed:
-        return "ok"
-    processed[dedup_key] = time.time()
-
-    u = get_user(uid)
+    dedup_key = f"{tenant()['id']}:{uid}:{update_id}:{message_id}"
+    with _processed_lock:
+        if dedup_key in processed:
+            return
+        processed[dedup_key] = clock.now()
+
+    # handle_message bumps counters, rate window and history before the GPT call,
+    # so a failed attempt is rolled back to keep the queue's retry idempotent
+    memory = tenant()["memory"]
+    before = copy.deepcopy(memory.get(uid))
+    try:
+        handle_message(uid, chat_id, text)
+    except BaseException:
+        if before is None:
+            memory.pop(uid, None)
+        else:
+            u = get_user(uid)
+            u.clear()
+            u.update(before)
+        # let the queue's retry through instead of dropping it as a duplicate
+        with _processed_lock:
+            processed.pop(dedup_key, None)
+        raise
+
+def handle_message(uid: int, chat_id: int, text: str):
+    with timed("state"):
+        u = get_user(uid)
 
     if u.get("takeover"):
-        return "ok"
+        return
 
     if not allow_rate(u):
-        return "ok"
+        return
 
     # update basics
     u["messages"] += 1
-    u["intent"] = detect_intent(text)
-    u["last_seen_ts"] = time.time()
+    with timed("regex"):
+        u["intent"] = detect_intent(text)
+    u["last_seen_ts"] = clock.now()
 
     # phase logic
     if u["messages"] < 4:
@@ -861,8 +1890,9 @@ def webhook():
 
     u["priority"] = (u["intent"] == "buyer_intent") or (u["messages"] >= 12)
 
-    extract_profile(u, text)
-    update_hesitation(u, text)
+    with timed("regex"):
+        extract_profile(u, text)
+        update_hesitation(u, text)
 
     # log inbound
     sheet_log("inbound_user", uid, u, text)
@@ -877,37 +1907,39 @@ def webhook():
         d = human_delay("casual", 1, False)
         wait_human(chat_id, d)
         send_message(chat_id, reply)
-        u["last_bot_ts"] = time.time()
+        u["last_bot_ts"] = clock.now()
         sheet_log("outbound_bot", uid, u, reply)
 
         u["history"].append({"role": "assistant", "content": reply})
         u["history"] = u["history"][-HISTORY_TURNS:]
-        return "ok"
+        return
 
     # FAQ fast answers (non-link, non-promo handled in funnel)
-    faq = match_faq(text)
+    with timed("regex"):
+        faq = match_faq(text)
     if faq in FAQ_REPLIES and faq not in ["link", "promo"]:
-        reply = sanitize_reply(FAQ_REPLIES[faq])
+        reply = sanitize_reply(FAQ_REPLIES[faq].format(persona=tenant()["persona_short"]))
         d = human_delay(u["intent"], u["phase"], u["priority"])
         wait_human(chat_id, d)
         if random.random() < 0.10:
             reply = sanitize_reply(f"{pre_filler()} {reply}")
         send_message(chat_id, reply)
-        u["last_bot_ts"] = time.time()
+        u["last_bot_ts"] = clock.now()
         sheet_log("outbound_bot", uid, u, reply)
 
         u["history"].append({"role": "assistant", "content": reply})
         u["history"] = u["history"][-HISTORY_TURNS:]
-        return "ok"
+        return
 
     # funnel override
-    handled, reply = funnel_reply(u, text)
+    with timed("regex"):
+        handled, reply = funnel_reply(u, text)
     if handled and reply:
         if u["intent"] == "buyer_intent" and should_alert(u):
             mark_alert(u)
             label = u.get("profile", {}).get("name") or f"uid:{uid}"
             alert_text = f"Hot intent ({label}) asked about Fanvue or promo. link_stage={u['link_stage']} hesitation={u.get('hesitation_score', 0)}"
-            notify_admin(alert_text, current_uid=uid)
+            queue_admin_alert(alert_text, uid, u)
             sheet_log("admin_alert", uid, u, alert_text)
 
         reply = sanitize_reply(reply)
@@ -916,12 +1948,12 @@ def webhook():
         if random.random() < 0.10:
             reply = sanitize_reply(f"{pre_filler()} {reply}")
         send_message(chat_id, reply)
-        u["last_bot_ts"] = time.time()
+        u["last_bot_ts"] = clock.now()
         sheet_log("outbound_bot", uid, u, reply)
 
         u["history"].append({"role": "assistant", "content": reply})
         u["history"] = u["history"][-HISTORY_TURNS:]
-        return "ok"
+        return
 
     # GPT response
     reply = gpt_reply(u)
@@ -931,14 +1963,204 @@ def webhook():
         reply = sanitize_reply(f"{pre_filler()} {reply}")
     send_message(chat_id, reply)
 
-    u["last_bot_ts"] = time.time()
+    u["last_bot_ts"] = clock.now()
     sheet_log("outbound_bot", uid, u, reply)
 
     u["history"].append({"role": "assistant", "content": reply})
     u["history"] = u["history"][-HISTORY_TURNS:]
 
+    return
+
+# ============================================================
+# 11.5) INBOUND QUEUE (fast ack, durable, at-least-once)
+# The webhook only stores the raw update; workers run handle_update().
+# Rows are deleted after processing, so a crash mid-update means it is
+# retried once its lease expires (processed{} filters the duplicates).
+# ============================================================
+_inbox_lock = threading.Lock()
+_inbox_busy_uids = set()   # (tenant, uid) a local worker is handling, keeps per-user order
+_inbox_wakeup = threading.Event()
+
+def _inbox_conn():
+    conn = sqlite3.connect(INBOX_DB_PATH, timeout=10, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+_inbox_db = None
+
+def inbox_db():
+    global _inbox_db
+    if _inbox_db is None:
+        _inbox_db = _inbox_conn()
+        _inbox_db.execute("""
+            CREATE TABLE IF NOT EXISTS inbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                uid INTEGER,
+                payload TEXT NOT NULL,
+                received_ts REAL NOT NULL,
+                claimed_ts REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                tenant TEXT NOT NULL DEFAULT 'default'
+            )
+        """)
+        cols = [r[1] for r in _inbox_db.execute("PRAGMA table_info(inbox)").fetchall()]
+        if "tenant" not in cols:
+            _inbox_db.execute(f"ALTER TABLE inbox ADD COLUMN tenant TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'")
+        _inbox_db.execute("CREATE INDEX IF NOT EXISTS inbox_key ON inbox (tenant, uid, id)")
+    return _inbox_db
+
+def update_uid(update: dict):
+    msg = update.get("message") or {}
+    return (msg.get("from") or {}).get("id", (msg.get("chat") or {}).get("id"))
+
+def enqueue_update(update: dict, tid: str):
+    with _inbox_lock:
+        inbox_db().execute(
+            "INSERT INTO inbox (tenant, uid, payload, received_ts) VALUES (?, ?, ?, ?)",
+            (tid, update_uid(update), json.dumps(update), time.time()),
+        )
+    _inbox_wakeup.set()
+
+def claim_update():
+    """
+    Oldest row of the oldest (tenant, uid) that has no row leased and isn't being
+    handled here, so one chatty user can't hide everyone else's updates.
+    Leases older than INBOX_LEASE_SECONDS are treated as abandoned (crashed worker);
+    such rows count as an attempt and are dropped after INBOX_MAX_ATTEMPTS.
+    """
+    now = time.time()
+    with _inbox_lock:
+        db = inbox_db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            return _claim_locked(db, now)
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+def _claim_locked(db, now: float):
+    while True:
+        rows = db.execute(
+            """
+            SELECT i.id, i.tenant, i.uid, i.payload, i.claimed_ts, i.attempts
+            FROM inbox i
+            JOIN (
+                SELECT MIN(id) AS first_id, MAX(claimed_ts > ?) AS leased
+                FROM inbox
+                GROUP BY tenant, uid
+            ) k ON i.id = k.first_id
+            WHERE k.leased = 0
+            ORDER BY i.id
+            LIMIT ?
+            """,
+            (now - INBOX_LEASE_SECONDS, len(_inbox_busy_uids) + 1),
+        ).fetchall()
+        dropped = False
+        for row_id, tid, uid, payload, claimed_ts, attempts in rows:
+            key = (tid, uid)
+            if key in _inbox_busy_uids:
+                continue
+            if claimed_ts and attempts >= INBOX_MAX_ATTEMPTS:
+                print("❌ Dropping update after expired leases:", row_id, key)
+                db.execute("DELETE FROM inbox WHERE id = ?", (row_id,))
+                dropped = True
+                continue
+            db.execute(
+                "UPDATE inbox SET claimed_ts = ?, attempts = attempts + 1 WHERE id = ?",
+                (now, row_id),
+            )
+            db.execute("COMMIT")
+            _inbox_busy_uids.add(key)
+            return row_id, key, json.loads(payload)
+        if not dropped:
+            db.execute("COMMIT")
+            return None
+        # dropping a row can expose that user's next one, so look again
+
+def finish_update(row_id: int, key):
+    with _inbox_lock:
+        inbox_db().execute("DELETE FROM inbox WHERE id = ?", (row_id,))
+        _inbox_busy_uids.discard(key)
+
+def release_update(row_id: int, key, attempts_left: bool):
+    with _inbox_lock:
+        if attempts_left:
+            inbox_db().execute("UPDATE inbox SET claimed_ts = 0 WHERE id = ?", (row_id,))
+        else:
+            inbox_db().execute("DELETE FROM inbox WHERE id = ?", (row_id,))
+        _inbox_busy_uids.discard(key)
+
+def inbox_depth() -> int:
+    with _inbox_lock:
+        return inbox_db().execute("SELECT COUNT(*) FROM inbox").fetchone()[0]
+
+def inbox_worker():
+    while True:
+        try:
+            claimed = claim_update()
+        except Exception as e:
+            print("❌ Inbox claim error:", e)
+            claimed = None
+        if not claimed:
+            _inbox_wakeup.wait(1.0)
+            _inbox_wakeup.clear()
+            continue
+
+        row_id, key, update = claimed
+        t = tenants.get(key[0])
+        if t is None:
+            print("❌ Dropping update for unknown tenant:", key[0])
+            finish_update(row_id, key)
+            continue
+        begin_timing()
+        try:
+            with using_tenant(t), t["memory"].holding(key[1]):
+                handle_update(update)
+        except Exception as e:
+            print("❌ Update processing error:", e)
+            with _inbox_lock:
+                row = inbox_db().execute("SELECT attempts FROM inbox WHERE id = ?", (row_id,)).fetchone()
+            release_update(row_id, key, attempts_left=bool(row) and row[0] < INBOX_MAX_ATTEMPTS)
+        else:
+            finish_update(row_id, key)
+        finally:
+            end_timing("worker:update")
+
+_inbox_workers_started = False
+
+def start_inbox_workers():
+    global _inbox_workers_started
+    if _inbox_workers_started or not ASYNC_WEBHOOK:
+        return
+    _inbox_workers_started = True
+    inbox_db()
+    for i in range(max(1, INBOX_WORKERS)):
+        threading.Thread(target=inbox_worker, name=f"inbox-worker-{i}", daemon=True).start()
+
+@app.route("/webhook", methods=["POST"])
+@app.route("/webhook/<tid>", methods=["POST"])
+def webhook(tid: str = DEFAULT_TENANT):
+    t = tenants.get(tid)
+    if t is None:
+        abort(404)
+
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict) or "update_id" not in update:
+        return "ok"
+
+    if not ASYNC_WEBHOOK:
+        with using_tenant(t), t["memory"].holding(update_uid(update)):
+            handle_update(update)
+        return "ok"
+
+    enqueue_update(update, tid)
     return "ok"
 
+start_inbox_workers()
+start_sheet_flusher()
+start_alert_digester()
+
 # ============================================================
 # 12) RENDER BINDING
 # ============================================================
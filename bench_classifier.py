@@ -0,0 +1,136 @@
+"""
+Precision / latency benchmark for the local FAQ + intent classifier in app.py.
+
+    python bench_classifier.py
+
+Messages here are held out (not in FAQ_EXAMPLES / INTENT_EXAMPLES), including
+small talk that shares words with the labeled examples, so precision is not
+just measured on rewordings of the training set.
+"""
+import os
+import time
+
+os.environ.setdefault("TELEGRAM_TOKEN", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("SHEET_LOGGING_ENABLED", "0")
+os.environ.setdefault("ASYNC_WEBHOOK", "0")
+os.environ.setdefault("USER_STORE_PATH", ":memory:")
+
+import app  # noqa: E402
+
+FAQ_HELDOUT = [
+    ("how much is it??", "price"),
+    ("hw much does it cost", "price"),
+    ("wats the price", "price"),
+    ("how much 4 a month", "price"),
+    ("is this even real", "safe"),
+    ("is this for real", "safe"),
+    ("r u legit", "safe"),
+    ("is this a scam or what", "safe"),
+    ("are u a real person", "safe"),
+    ("wat do i get", "what_you_get"),
+    ("whats on ur page", "what_you_get"),
+    ("what kind of stuff do you post", "what_you_get"),
+    ("can i cancle", "cancel"),
+    ("can i cancel later", "cancel"),
+    ("how do i get a refund", "cancel"),
+    ("where do i join", "link"),
+    ("send the lnk", "link"),
+    ("any discounts", "promo"),
+    ("any promo", "promo"),
+    ("where r u from", "bio"),
+    ("what happend to ur eye", "bio"),
+    ("hey whats up", None),
+    ("good night", None),
+    ("i went to the gym today", None),
+    ("haha thats funny", None),
+    ("what are you up to", None),
+    ("i love padel", None),
+    ("im from berlin", None),
+    ("you seem nice", None),
+    ("how is your day going", None),
+    ("do you like music", None),
+    # hard negatives reported in review
+    ("how much do you train", None),
+    ("how much do you love padel", None),
+    ("can i stop by", None),
+    ("what do you do", None),
+    ("how much water do you drink", None),
+    ("can i stop texting for a bit", None),
+    ("what do you do after training", None),
+    ("is it real cold in europe", None),
+    ("how can i get access", None),
+]
+
+INTENT_HELDOUT = [
+    ("i wanna see more of u", "buyer_intent"),
+    ("how can i get access", "buyer_intent"),
+    ("i want ur private stuff", "buyer_intent"),
+    ("can i get a custom", "buyer_intent"),
+    ("show me more pls", "buyer_intent"),
+    ("hows your day", None),
+    ("i just woke up", None),
+    ("what do you like to do", None),
+    ("i like football", None),
+    ("im chilling", None),
+    # hard negatives reported in review
+    ("show me your dog", None),
+    ("i want to see you smile", None),
+    ("i want to see more movies", None),
+    ("i want to see the mountains", None),
+    ("show me your favorite song", None),
+    ("how can i get stronger", None),
+    ("i want more sleep", None),
+]
+
+def evaluate(name, cases, rule_fn, clf_fn, positive=None):
+    tp = fp = fn = rule_hits = 0
+    for text, expected in cases:
+        if rule_fn(text):
+            rule_hits += 1
+            continue
+        got = clf_fn(text)
+        if positive is not None:
+            got = got if got == positive else None
+        if got is not None and got == expected:
+            tp += 1
+        elif got is not None:
+            fp += 1
+            print(f"  wrong: {text!r} -> {got} (expected {expected})")
+        elif expected is not None:
+            fn += 1
+    precision = tp / (tp + fp) if (tp + fp) else 1.0
+    print(
+        f"{name}: cases={len(cases)} caught_by_rules={rule_hits} "
+        f"classifier_tp={tp} fp={fp} missed={fn} precision={precision:.2f}"
+    )
+
+def faq_rules(text):
+    t = text.lower()
+    return any(any(k in t for k in kws) for kws in app.FAQ_MAP.values())
+
+def intent_rules(text):
+    t = text.lower()
+    return any(k in t for k in ["fanvue", "subscribe", "subscription", "sub", "link", "account", "join", "sign up",
+                                "spicy", "nudes", "nsfw", "explicit", "sex", "porn",
+                                "photo", "pic", "pics", "selfie", "snap"])
+
+def latency(fn, texts, rounds=200):
+    samples = []
+    for _ in range(rounds):
+        for t in texts:
+            started = time.perf_counter()
+            fn(t)
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    return p50, p99
+
+if __name__ == "__main__":
+    evaluate("faq", FAQ_HELDOUT, faq_rules, app.classify_faq)
+    evaluate("intent", INTENT_HELDOUT, intent_rules, app.classify_intent, positive="buyer_intent")
+    texts = [t for t, _ in FAQ_HELDOUT + INTENT_HELDOUT]
+    for label, fn in [("classify_faq", app.classify_faq), ("classify_intent", app.classify_intent)]:
+        p50, p99 = latency(fn, texts)
+        print(f"{label}: p50={p50:.0f}us p99={p99:.0f}us")
@@ -0,0 +1,133 @@
+"""
+Replays simulated traffic plus /cron ticks on the virtual clock and checks the
+follow-up / re-engage scheduling rules. The default window runs two re-engage
+cooldowns past the last arrival, so every re-engage path is exercised.
+
+    python sim_followups.py [users] [hours]
+
+Telegram sends and GPT replies are replaced with local recorders; nothing
+leaves the process. Exits non-zero if a scheduling rule is broken.
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+os.environ.setdefault("TELEGRAM_TOKEN", "sim")
+os.environ.setdefault("OPENAI_API_KEY", "sim")
+os.environ.setdefault("SHEET_LOGGING_ENABLED", "0")
+os.environ.setdefault("USER_STORE_PATH", ":memory:")
+os.environ.setdefault("HOT_USERS_MAX", "500")
+os.environ.setdefault("ALERT_DIGEST_SECONDS", "0")
+os.environ["SIMULATED_CLOCK"] = "1"
+
+import app  # noqa: E402
+
+CRON_EVERY_SECONDS = 5 * 60
+ARRIVAL_HOURS = 12.0
+DEFAULT_HOURS = ARRIVAL_HOURS + 2 * app.REENGAGE_COOLDOWN_HOURS
+
+def build_traffic(users: int, hours: float, start: float):
+    """
+    (ts, uid, text) sorted by ts: each user shows up within the first
+    ARRIVAL_HOURS (or half the window if shorter), sends a few messages,
+    and some of them ask for the link.
+    """
+    spread = min(ARRIVAL_HOURS, hours / 2) * 3600
+    events = []
+    for uid in range(1, users + 1):
+        t = start + random.uniform(0, spread)
+        for i in range(random.randint(1, 4)):
+            if i == 0:
+                text = "hey"
+            elif random.random() < 0.15:
+                text = "send link"
+            else:
+                text = random.choice(["i just got back from the gym", "what do you do", "tell me more", "im bored"])
+            events.append((t, uid, text))
+            t += random.uniform(60, 20 * 60)
+    events.sort()
+    return events
+
+def main(users: int = 2000, hours: float = DEFAULT_HOURS):
+    random.seed(7)
+    clock = app.clock
+    start = clock.now()
+
+    sends = []
+    events = defaultdict(list)   # uid -> [(event, ts)]
+    app.tg_post = lambda method, payload: sends.append(payload) if method == "sendMessage" else None
+    app.gpt_reply = lambda u: "haha okay, what are you up to today?"
+    app.sheet_log = lambda event, uid, u, text_preview="": events[uid].append((event, clock.now(), u.get("link_stage", 0)))
+
+    traffic = build_traffic(users, hours, start)
+    inbound = defaultdict(list)  # uid -> [ts]
+    for ts, uid, _ in traffic:
+        inbound[uid].append(ts)
+    client = app.app.test_client()
+    next_cron = start + CRON_EVERY_SECONDS
+    end = start + hours * 3600
+    update_id = 0
+    cron_sent = 0
+    wall = time.perf_counter()
+
+    def tick_until(ts):
+        nonlocal next_cron, cron_sent
+        while next_cron <= ts:
+            if clock.now() < next_cron:
+                clock.advance(next_cron - clock.now())
+            cron_sent += client.get("/cron").get_json()["sent"]
+            next_cron += CRON_EVERY_SECONDS
+
+    for ts, uid, text in traffic:
+        tick_until(ts)
+        if clock.now() < ts:
+            clock.advance(ts - clock.now())
+        update_id += 1
+        client.post("/webhook", json={
+            "update_id": update_id,
+            "message": {"message_id": update_id, "chat": {"id": uid}, "from": {"id": uid}, "text": text},
+        })
+    tick_until(end)
+    wall = time.perf_counter() - wall
+
+    problems = 0
+    followups = reengages = 0
+    cooldown = app.REENGAGE_COOLDOWN_HOURS * 3600
+    for uid, evs in events.items():
+        per_day = defaultdict(int)
+        last_reengage = None
+        for event, ts, link_stage in evs:
+            if event == "followup":
+                followups += 1
+                per_day[time.strftime("%Y%m%d", time.gmtime(ts))] += 1
+                if link_stage == 2:
+                    problems += 1
+                    print(f"  follow-up after link sent: uid={uid}")
+            elif event == "reengage":
+                reengages += 1
+                last_in = max(t for t in inbound[uid] if t <= ts)
+                if ts - last_in < cooldown:
+                    problems += 1
+                    print(f"  re-engage {(ts - last_in) / 3600:.1f}h after last message: uid={uid}")
+                if last_reengage is not None and ts - last_reengage < cooldown:
+                    problems += 1
+                    print(f"  re-engage {(ts - last_reengage) / 3600:.1f}h after previous one: uid={uid}")
+                last_reengage = ts
+        for day, n in per_day.items():
+            if n > app.FOLLOWUP_MAX_PER_DAY:
+                problems += 1
+                print(f"  {n} follow-ups on {day}: uid={uid}")
+
+    memory = app.tenants[app.DEFAULT_TENANT]["memory"]
+    print(
+        f"users={users} simulated={hours:.0f}h messages={len(traffic)} cron_ticks={int(hours * 3600 // CRON_EVERY_SECONDS)} "
+        f"followups={followups} reengages={reengages} cron_sent={cron_sent} "
+        f"hot={len(memory.hot)} cold={memory.cold_count()} wall={wall:.1f}s problems={problems}"
+    )
+    return problems
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sys.exit(1 if main(int(args[0]) if args else 2000, float(args[1]) if len(args) > 1 else DEFAULT_HOURS) else 0)